@@ -0,0 +1,25 @@
+import json
+import re
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson turns integers outside the 64-bit range into floats where json keeps them exact;
+# a run of 19+ digits sends the whole document to json (inside a string it only costs speed)
+_WIDE_INT_RE = re.compile(rb"\d{19}")
+
+
+def loads(data: bytes) -> Any:
+    """
+    json.loads(data), through orjson when it gives the same value
+    """
+    if orjson is None or _WIDE_INT_RE.search(data):
+        return json.loads(data)
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        # NaN/Infinity literals, lone surrogates and non-UTF-8 input are rejected by orjson only
+        return json.loads(data)
@@ -0,0 +1,67 @@
+from difflib import SequenceMatcher
+from typing import List, Tuple, Union
+
+try:
+    import difflib_fast
+except ImportError:
+    difflib_fast = None
+
+try:
+    from rapidfuzz.distance import Indel
+except ImportError:
+    Indel = None
+
+# SequenceMatcher turns on its autojunk heuristic once b reaches this length;
+# difflib_fast reproduces the ratio exactly only below it
+_AUTOJUNK_MIN_LEN = 200
+
+
+def ratio(a: str, b: str) -> float:
+    """
+    SequenceMatcher(None, a, b).ratio(), through difflib_fast when it gives the same value
+    """
+    if difflib_fast is not None and len(b) < _AUTOJUNK_MIN_LEN:
+        return difflib_fast.ratio(a, b)
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def ratio_many(pairs: List[Tuple[str, str]]) -> List[float]:
+    """
+    ratio for every (a, b) pair; difflib_fast scores the eligible ones in one parallel batch
+    """
+    if difflib_fast is None:
+        return [SequenceMatcher(None, a, b).ratio() for a, b in pairs]
+    ratios = [0.0] * len(pairs)
+    short_idx = []
+    for i, (a, b) in enumerate(pairs):
+        if len(b) < _AUTOJUNK_MIN_LEN:
+            short_idx.append(i)
+        else:
+            ratios[i] = SequenceMatcher(None, a, b).ratio()
+    for i, r in zip(short_idx, difflib_fast.ratio([pairs[i] for i in short_idx])):
+        ratios[i] = r
+    return ratios
+
+
+def ratio_upper_bound(a: str, b: str) -> float:
+    """
+    Upper bound on ratio(a, b): 2 * LCS / total from rapidfuzz's Indel distance when installed,
+    otherwise the ratio reached if every character of the shorter string matched
+    """
+    total = len(a) + len(b)
+    if not total:
+        return 1.0
+    if Indel is not None:
+        return (total - Indel.distance(a, b)) / total
+    return 2.0 * min(len(a), len(b)) / total
+
+
+def score_many(prepared: List[Union[int, Tuple[str, str]]], threshold: float) -> List[int]:
+    """
+    Resolve a batch of settled 0/1 results and (y_s, p_s) pairs still to score, in place;
+    the pending pairs go through a single ratio_many call
+    """
+    pending_idx = [i for i, r in enumerate(prepared) if not isinstance(r, int)]
+    for i, r in zip(pending_idx, ratio_many([prepared[i] for i in pending_idx])):
+        prepared[i] = 1 if r >= threshold else 0
+    return prepared
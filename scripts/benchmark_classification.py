@@ -1,23 +1,47 @@
 #!/usr/bin/env python3
 import argparse
 import json
+import multiprocessing
+import sys
 import time
-from difflib import SequenceMatcher
-import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from datetime import datetime
+from pathlib import Path
 
+from _jsonio import loads
+from _similarity import ratio, ratio_upper_bound
+
+
+_MIN_POOL_PAIRS = 4
 
 def process_file(file_path):
-    with open(file_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    with open(file_path, "rb") as f:
+        return loads(f.read())
 
 
-def compare_strings(y, pred, threshold=0.85):
+def _prepare_strings(y, pred, threshold):
+    """1 or 0 when the pair is settled without the matcher, else the (y_s, p_s) strings to score"""
     if y == pred:
         return 1
     if y is None or pred is None:
         return 0
-    similarity = SequenceMatcher(None, str(y), str(pred)).ratio()
+    y_s, p_s = str(y), str(pred)
+    if ratio_upper_bound(y_s, p_s) < threshold:
+        return 0
+    return y_s, p_s
+
+
+def compare_strings(y, pred, threshold=0.85):
+    prepared = _prepare_strings(y, pred, threshold)
+    if isinstance(prepared, int):
+        return prepared
+    return _compare_text(*prepared, threshold)
+
+
+@lru_cache(maxsize=8192)
+def _compare_text(y_s, p_s, threshold):
+    similarity = ratio(y_s, p_s)
     return 1 if similarity >= threshold else 0
 
 
@@ -25,8 +49,8 @@ def build_path_map(obj):
 
     result = {}
     for f in obj.get("files", []):
-        path = str(f.get("path", "")).strip()
-        ftype = str(f.get("type", "")).strip()
+        path = sys.intern(str(f.get("path", "")).strip())
+        ftype = sys.intern(str(f.get("type", "")).strip())
         if path:
             result[path] = ftype
     return result
@@ -36,19 +60,16 @@ def evaluate(gt, pred):
     gt_map = build_path_map(gt)
     pred_map = build_path_map(pred)
 
-    gt_paths = set(gt_map.keys())
-    pred_paths = set(pred_map.keys())
-
-    common_paths = gt_paths & pred_paths
-    missing = gt_paths - pred_paths
-    extra = pred_paths - gt_paths
+    missing = gt_map.keys() - pred_map.keys()
+    extra = pred_map.keys() - gt_map.keys()
 
     correct = 0
     per_type_stats = {}
 
-    for path in common_paths:
-        gt_type = gt_map[path]
-        pred_type = pred_map[path]
+    for path, gt_type in gt_map.items():
+        pred_type = pred_map.get(path)
+        if pred_type is None:
+            continue
 
         per_type_stats.setdefault(gt_type, {"total": 0, "correct": 0})
         per_type_stats[gt_type]["total"] += 1
@@ -75,6 +96,18 @@ def evaluate(gt, pred):
     }
 
 
+def _evaluate_pair(pair):
+    gt_path, pred_path = pair
+    return evaluate(process_file(gt_path), process_file(pred_path))
+
+
+def run_many(pairs):
+    if len(pairs) < _MIN_POOL_PAIRS:
+        return [_evaluate_pair(pair) for pair in pairs]
+    with ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn")) as pool:
+        return list(pool.map(_evaluate_pair, pairs))
+
+
 def main():
     parser = argparse.ArgumentParser(description="Benchmark classification")
     parser.add_argument("--gt", required=True)
@@ -92,13 +125,13 @@ def main():
     print(json.dumps(report, indent=2, ensure_ascii=False))
 
     if args.out is None:
-        os.makedirs("reports", exist_ok=True)
-        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-        args.out = f"reports/report_classification_{ts}.json"
+        out_path = Path("reports") / f"report_classification_{datetime.now():%Y%m%d_%H%M%S}.json"
     else:
-        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        out_path = Path(args.out)
+    if out_path.parent != Path("."):
+        out_path.parent.mkdir(parents=True, exist_ok=True)
 
-    with open(args.out, "w", encoding="utf-8") as f:
+    with open(out_path, "w", encoding="utf-8") as f:
         json.dump(report, f, indent=2, ensure_ascii=False)
 
 
@@ -1,19 +1,29 @@
 #!/usr/bin/env python3
 import argparse
 import json
+import multiprocessing
 import re
 import sys
 import time
-from difflib import SequenceMatcher
-from typing import Any, Dict, List, Optional
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from typing import Any, Dict, List, Optional, Tuple, Union
 import os
 from datetime import datetime
 
+from _jsonio import loads
+from _similarity import ratio, ratio_upper_bound, score_many
+
 _DIGITS_RE = re.compile(r"\D+")
+_STRIP_NON_DIGITS = _DIGITS_RE.sub
+_ASCII_NON_DIGITS = str.maketrans("", "", "".join(chr(c) for c in range(128) if not chr(c).isdigit()))
+
+_MIN_POOL_PAIRS = 4
 
 def load_json(path: str) -> Dict[str, Any]:
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    with open(path, "rb") as f:
+        data = loads(f.read())
     if not isinstance(data, dict):
         raise ValueError(f"{path}: expected JSON object at top-level")
     return data
@@ -25,41 +35,75 @@ def norm_text(s: Any) -> Optional[str]:
     return str(s).strip()
 
 
-def compare_strings(y: Any, pred: Any, threshold: float = 0.85) -> int:
+def _prepare_strings(y: Any, pred: Any, threshold: float) -> Union[int, Tuple[str, str]]:
+    """
+    1 or 0 when the pair is settled without the matcher, else the normalized (y_s, p_s) to score
+    """
     y_s = norm_text(y)
     p_s = norm_text(pred)
     if y_s == p_s:
         return 1
     if y_s is None or p_s is None:
         return 0
-    sim = SequenceMatcher(None, y_s, p_s).ratio()
+    if ratio_upper_bound(y_s, p_s) < threshold:
+        return 0
+    return y_s, p_s
+
+
+def compare_strings(y: Any, pred: Any, threshold: float = 0.85) -> int:
+    prepared = _prepare_strings(y, pred, threshold)
+    if isinstance(prepared, int):
+        return prepared
+    return _compare_text(*prepared, threshold)
+
+
+@lru_cache(maxsize=8192)
+def _compare_text(y_s: str, p_s: str, threshold: float) -> int:
+    sim = ratio(y_s, p_s)
     return 1 if sim >= threshold else 0
 
 
+def compare_strings_many(pairs: List[Tuple[Any, Any]], threshold: float = 0.85) -> List[int]:
+    """
+    compare_strings for each (y, pred) pair, with the remaining ratios scored in one batch
+    """
+    return score_many([_prepare_strings(y, pred, threshold) for y, pred in pairs], threshold)
+
+
 def normalize_hs(code: Any) -> str:
 
     if code is None:
         return ""
-    s = str(code).strip()
-    s = _DIGITS_RE.sub("", s)
-    return s
+    return _digits_only(str(code))
 
 
-def is_valid_hs_10(code_digits: str) -> bool:
-    return len(code_digits) == 10 and code_digits.isdigit()
+@lru_cache(maxsize=4096)
+def _digits_only(s: str) -> str:
+    if s.isascii():
+        return s.translate(_ASCII_NON_DIGITS)
+    return _STRIP_NON_DIGITS("", s)
 
 
-def is_valid_hs_6plus(code_digits: str) -> bool:
-    return len(code_digits) >= 6 and code_digits[:6].isdigit()
+def count_valid_hs(codes: List[str]) -> Tuple[int, int]:
+    """
+    (number of 10-digit codes, number of codes with at least 6 digits) among normalized codes
+    """
+    len_counts = Counter(map(len, codes))
+    return len_counts[10], sum(c for length, c in len_counts.items() if length >= 6)
 
 
-def prefix_match(gt_digits: str, pred_digits: str, k: int) -> int:
+def common_prefix_len(gt_digits: str, pred_digits: str, limit: int = 10) -> int:
     """
-    1 if first k digits match exactly (and both have >= k digits), else 0
+    Number of leading digits (at most limit) on which gt and pred agree;
+    the first k digits match exactly iff the result is >= k
     """
-    if len(gt_digits) < k or len(pred_digits) < k:
-        return 0
-    return 1 if gt_digits[:k] == pred_digits[:k] else 0
+    n = min(len(gt_digits), len(pred_digits), limit)
+    if gt_digits[:n] == pred_digits[:n]:
+        return n
+    i = 0
+    while gt_digits[i] == pred_digits[i]:
+        i += 1
+    return i
 
 
 def evaluate(gt: Dict[str, Any], pred: Dict[str, Any], *, min_sim: float) -> Dict[str, Any]:
@@ -70,38 +114,31 @@ def evaluate(gt: Dict[str, Any], pred: Dict[str, Any], *, min_sim: float) -> Dic
     n_pr = len(pr_items)
     n = max(n_gt, 1)
 
-    seller_match = compare_strings(gt.get("seller_name"), pred.get("seller_name"), threshold=min_sim)
-
     items_to_compare = min(n_gt, n_pr)
-    item_name_matches = 0
-
-    gt_valid_10 = 0
-    gt_valid_6 = 0
-    pr_valid_10 = 0
-    pr_valid_6 = 0
-
-    prefix_hits = {k: 0 for k in range(1, 11)}
-
-    for i in range(n_gt):
-        g = gt_items[i] or {}
-        g_hs = normalize_hs(g.get("hs_code"))
-        if is_valid_hs_10(g_hs):
-            gt_valid_10 += 1
-        if is_valid_hs_6plus(g_hs):
-            gt_valid_6 += 1
-
-        if i < n_pr:
-            p = pr_items[i] or {}
-            item_name_matches += compare_strings(g.get("item_name"), p.get("item_name"), threshold=min_sim)
-
-            p_hs = normalize_hs(p.get("hs_code"))
-            if is_valid_hs_10(p_hs):
-                pr_valid_10 += 1
-            if is_valid_hs_6plus(p_hs):
-                pr_valid_6 += 1
-
-            for k in range(1, 11):
-                prefix_hits[k] += prefix_match(g_hs, p_hs, k)
+    gt_items = [g or {} for g in gt_items]
+    pr_items = [p or {} for p in pr_items[:items_to_compare]]
+
+    gt_hs = [normalize_hs(g.get("hs_code")) for g in gt_items]
+    pr_hs = [normalize_hs(p.get("hs_code")) for p in pr_items]
+
+    gt_valid_10, gt_valid_6 = count_valid_hs(gt_hs)
+    pr_valid_10, pr_valid_6 = count_valid_hs(pr_hs)
+
+    # a common prefix of length L is a hit for every k <= L
+    prefix_len_counts = Counter(map(common_prefix_len, gt_hs, pr_hs))
+    prefix_hits = {}
+    hits = 0
+    for k in range(10, 0, -1):
+        hits += prefix_len_counts[k]
+        prefix_hits[k] = hits
+
+    name_pairs: List[Tuple[Any, Any]] = [
+        (g.get("item_name"), p.get("item_name")) for g, p in zip(gt_items, pr_items)
+    ]
+    name_pairs.append((gt.get("seller_name"), pred.get("seller_name")))
+    name_matches = compare_strings_many(name_pairs, threshold=min_sim)
+    seller_match = name_matches.pop()
+    item_name_matches = sum(name_matches)
 
     gt_10_pct = (gt_valid_10 / n_gt * 100.0) if n_gt else 0.0
     gt_6_pct = (gt_valid_6 / n_gt * 100.0) if n_gt else 0.0
@@ -129,6 +166,19 @@ def evaluate(gt: Dict[str, Any], pred: Dict[str, Any], *, min_sim: float) -> Dic
     }
 
 
+def _evaluate_pair(pair: Tuple[str, str], min_sim: float) -> Dict[str, Any]:
+    gt_path, pred_path = pair
+    return evaluate(load_json(gt_path), load_json(pred_path), min_sim=min_sim)
+
+
+def run_many(pairs: List[Tuple[str, str]], *, min_sim: float = 0.85) -> List[Dict[str, Any]]:
+    worker = partial(_evaluate_pair, min_sim=min_sim)
+    if len(pairs) < _MIN_POOL_PAIRS:
+        return [worker(pair) for pair in pairs]
+    with ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn")) as pool:
+        return list(pool.map(worker, pairs))
+
+
 def main():
     ap = argparse.ArgumentParser(description="Benchmark HS code generation (prefix accuracy 1..10)")
     ap.add_argument("--gt", required=True, help="Ground truth JSON file")
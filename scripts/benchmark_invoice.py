@@ -1,40 +1,73 @@
 #!/usr/bin/env python3
 import json
+import multiprocessing
 import sys
 import time
-from difflib import SequenceMatcher
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 import argparse
-import os
 from datetime import datetime
+from pathlib import Path
 
+from _jsonio import loads
+from _similarity import ratio, ratio_upper_bound, score_many
+
+_NUMBER_TOLERANCE = 0.001
+_MIN_DENOM = 1e-9
+
+_MIN_POOL_PAIRS = 4
 
 def process_file(file_path):
-    with open(file_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    with open(file_path, "rb") as f:
+        return loads(f.read())
 
 
-def compare_strings(y, pred, threshold=0.7):
+def _prepare_strings(y, pred, threshold):
+    """1 or 0 when the pair is settled without the matcher, else the (y_s, p_s) strings to score"""
     if y == pred:
         return 1
     if y is None or pred is None:
         return 0
-    similarity = SequenceMatcher(None, str(y), str(pred)).ratio()
+    y_s, p_s = str(y), str(pred)
+    if ratio_upper_bound(y_s, p_s) < threshold:
+        return 0
+    return y_s, p_s
+
+
+def compare_strings(y, pred, threshold=0.7):
+    prepared = _prepare_strings(y, pred, threshold)
+    if isinstance(prepared, int):
+        return prepared
+    return _compare_text(*prepared, threshold)
+
+
+@lru_cache(maxsize=8192)
+def _compare_text(y_s, p_s, threshold):
+    similarity = ratio(y_s, p_s)
     return 1 if similarity >= threshold else 0
 
 
-def compare_numbers(y, pred, tolerance=0.001):
+def compare_strings_many(pairs, threshold=0.7):
+    """compare_strings for each (y, pred) pair, with the remaining ratios scored in one batch"""
+    return score_many([_prepare_strings(y, pred, threshold) for y, pred in pairs], threshold)
+
+
+def compare_numbers(y, pred, tolerance=_NUMBER_TOLERANCE):
     if y == pred:
         return 1
-    try:
-        y_f = float(y) if y is not None else 0.0
-        p_f = float(pred) if pred is not None else 0.0
-        if y_f == 0.0 and p_f == 0.0:
-            return 1
-        denom = max(abs(y_f), abs(p_f), 1e-9)
-        rel_diff = abs(y_f - p_f) / denom
-        return 1 if rel_diff <= tolerance else 0
-    except Exception:
-        return 0
+    if isinstance(y, (int, float)) and isinstance(pred, (int, float)):
+        y_f, p_f = y, pred
+    else:
+        try:
+            y_f = float(y) if y is not None else 0.0
+            p_f = float(pred) if pred is not None else 0.0
+        except Exception:
+            return 0
+    if y_f == 0.0 and p_f == 0.0:
+        return 1
+    denom = max(abs(y_f), abs(p_f), _MIN_DENOM)
+    rel_diff = abs(y_f - p_f) / denom
+    return 1 if rel_diff <= tolerance else 0
 
 
 def evaluate(y, pred):
@@ -42,23 +75,14 @@ def evaluate(y, pred):
     pred_items = pred.get("items", []) or []
 
     if len(y_items) != len(pred_items):
-        print(f"Item count mismatch: Expected {len(y_items)}, Predicted {len(pred_items)}")
-
-    items_to_compare = min(len(y_items), len(pred_items))
+        print(f"Item count mismatch: Expected {len(y_items)}, Predicted {len(pred_items)}", file=sys.stderr)
 
-    item_name_matches = 0
-    quantity_matches = 0
-    unit_price_matches = 0
-    total_price_matches = 0
+    item_pairs = [(y_item or {}, p_item or {}) for y_item, p_item in zip(y_items, pred_items)]
 
-    for i in range(items_to_compare):
-        y_item = y_items[i] or {}
-        p_item = pred_items[i] or {}
-
-        item_name_matches += compare_strings(y_item.get("item_name"), p_item.get("item_name"))
-        quantity_matches += compare_numbers(y_item.get("quantity"), p_item.get("quantity"))
-        unit_price_matches += compare_numbers(y_item.get("unit_price"), p_item.get("unit_price"))
-        total_price_matches += compare_numbers(y_item.get("total_price"), p_item.get("total_price"))
+    item_name_matches = sum(compare_strings_many([(g.get("item_name"), p.get("item_name")) for g, p in item_pairs]))
+    quantity_matches = sum(compare_numbers(g.get("quantity"), p.get("quantity")) for g, p in item_pairs)
+    unit_price_matches = sum(compare_numbers(g.get("unit_price"), p.get("unit_price")) for g, p in item_pairs)
+    total_price_matches = sum(compare_numbers(g.get("total_price"), p.get("total_price")) for g, p in item_pairs)
 
     return {
         "seller_name": compare_strings(y.get("seller_name"), pred.get("seller_name")),
@@ -78,11 +102,24 @@ def evaluate(y, pred):
     }
 
 
+def _evaluate_pair(pair):
+    gt_path, pred_path = pair
+    return evaluate(process_file(gt_path), process_file(pred_path))
+
+
+def run_many(pairs):
+    if len(pairs) < _MIN_POOL_PAIRS:
+        return [_evaluate_pair(pair) for pair in pairs]
+    with ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn")) as pool:
+        return list(pool.map(_evaluate_pair, pairs))
+
+
 def main():
     parser = argparse.ArgumentParser(description="Benchmark invoice processing")
     parser.add_argument("--gt", required=True, help="Ground truth JSON file")
     parser.add_argument("--pred", required=True, help="Prediction JSON file")
     parser.add_argument("--out", default=None, help="Output report JSON file (optional)")
+    parser.add_argument("--verbose", action="store_true", help="Print the formatted results banner")
     args = parser.parse_args()
 
     start_time = time.time()
@@ -91,21 +128,15 @@ def main():
         y = process_file(args.gt)
         pred = process_file(args.pred)
 
-        print(f"Ground truth file: {args.gt}")
-        print(f"Prediction file: {args.pred}")
-
         res = evaluate(y, pred)
         n = max(res["n_items"], 1)
-
+        item_ratios = {field: matches / n for field, matches in res["items"].items()}
         overall_components = [
             res["seller_name"],
             res["sum_total_price"],
             res["currency"],
             res["item_count_match"],
-            res["items"]["item_name"] / n,
-            res["items"]["quantity"] / n,
-            res["items"]["unit_price"] / n,
-            res["items"]["total_price"] / n,
+            *item_ratios.values(),
         ]
         overall_score = (sum(overall_components) / 8.0) * 100.0
 
@@ -120,52 +151,54 @@ def main():
             "item_count_match": f"{res['item_count_match'] * 100:.2f} %",
             "missing_items": f"{(res['missing_items'] / n) * 100:.2f} %",
             "extra_items": f"{(res['extra_items'] / n) * 100:.2f} %",
-            "items": {
-                "item_name": f"{(res['items']['item_name'] / n) * 100:.2f} %",
-                "quantity": f"{(res['items']['quantity'] / n) * 100:.2f} %",
-                "unit_price": f"{(res['items']['unit_price'] / n) * 100:.2f} %",
-                "total_price": f"{(res['items']['total_price'] / n) * 100:.2f} %",
-            },
+            "items": {field: f"{share * 100:.2f} %" for field, share in item_ratios.items()},
+            "overall_score": f"{overall_score:.2f} %",
             "time_seconds": f"{elapsed:.2f} seconds",
             "price": "$0.02",
         }
 
-        print("\n" + "=" * 50)
-        print("INVOICE PROCESSING BENCHMARK RESULTS")
-        print("=" * 50)
-
-        print(f"\nSeller Name: {result['seller_name']}")
-        print(f"Sum Total Quantity: {result['sum_total_quantity']}")
-        print(f"Sum Total Price: {result['sum_total_price']}")
-        print(f"Currency: {result['currency']}")
-        print(f"n_items: {result['n_items']}")
-        print(f"Item Count Match: {result['item_count_match']}")
-        print(f"Missing Items: {result['missing_items']}")
-        print(f"Extra Items: {result['extra_items']}")
-
-        print("\nItems:")
-        print(f"  item_name: {result['items']['item_name']}")
-        print(f"  quantity: {result['items']['quantity']}")
-        print(f"  unit_price: {result['items']['unit_price']}")
-        print(f"  total_price: {result['items']['total_price']}")
-
-        print(f"\nOverall Score: {overall_score:.2f} %")
-        print(f"Time: {result['time_seconds']}")
-        print(f"Price: {result['price']}")
-        print("=" * 50)
+        if args.verbose:
+            print(f"Ground truth file: {args.gt}")
+            print(f"Prediction file: {args.pred}")
+
+            print("\n" + "=" * 50)
+            print("INVOICE PROCESSING BENCHMARK RESULTS")
+            print("=" * 50)
+
+            print(f"\nSeller Name: {result['seller_name']}")
+            print(f"Sum Total Quantity: {result['sum_total_quantity']}")
+            print(f"Sum Total Price: {result['sum_total_price']}")
+            print(f"Currency: {result['currency']}")
+            print(f"n_items: {result['n_items']}")
+            print(f"Item Count Match: {result['item_count_match']}")
+            print(f"Missing Items: {result['missing_items']}")
+            print(f"Extra Items: {result['extra_items']}")
+
+            print("\nItems:")
+            print(f"  item_name: {result['items']['item_name']}")
+            print(f"  quantity: {result['items']['quantity']}")
+            print(f"  unit_price: {result['items']['unit_price']}")
+            print(f"  total_price: {result['items']['total_price']}")
+
+            print(f"\nOverall Score: {result['overall_score']}")
+            print(f"Time: {result['time_seconds']}")
+            print(f"Price: {result['price']}")
+            print("=" * 50)
+        else:
+            print(json.dumps(result, ensure_ascii=False, indent=2))
 
         if args.out is None:
-            os.makedirs("reports", exist_ok=True)
-            ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-            args.out = f"reports/report_invoice_{ts}.json"
+            out_path = Path("reports") / f"report_invoice_{datetime.now():%Y%m%d_%H%M%S}.json"
         else:
-            os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
-
+            out_path = Path(args.out)
+        if out_path.parent != Path("."):
+            out_path.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(args.out, "w", encoding="utf-8") as f:
+        with open(out_path, "w", encoding="utf-8") as f:
             json.dump(result, f, ensure_ascii=False, indent=2)
 
-        print(f"\nDetailed report saved to: {args.out}")
+        if args.verbose:
+            print(f"\nDetailed report saved to: {out_path}")
 
     except Exception as e:
         print(f"Error: {e}")
@@ -1,74 +1,112 @@
 #!/usr/bin/env python3
 import json
+import multiprocessing
 import sys
 import time
 import argparse
-from difflib import SequenceMatcher
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 import os
 from datetime import datetime
 
+from _jsonio import loads
+from _similarity import ratio, ratio_upper_bound
+
+_MIN_POOL_PAIRS = 4
+
 def process_file(file_path):
-    with open(file_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    with open(file_path, "rb") as f:
+        return loads(f.read())
 
 
-def compare_strings(y, pred, threshold=0.85):
+def _prepare_strings(y, pred, threshold):
+    """1 or 0 when the pair is settled without the matcher, else the (y_s, p_s) strings to score"""
     if y == pred:
         return 1
     if y is None or pred is None:
         return 0
-    similarity = SequenceMatcher(None, str(y), str(pred)).ratio()
+    y_s, p_s = str(y), str(pred)
+    if ratio_upper_bound(y_s, p_s) < threshold:
+        return 0
+    return y_s, p_s
+
+
+def compare_strings(y, pred, threshold=0.85):
+    prepared = _prepare_strings(y, pred, threshold)
+    if isinstance(prepared, int):
+        return prepared
+    return _compare_text(*prepared, threshold)
+
+
+@lru_cache(maxsize=8192)
+def _compare_text(y_s, p_s, threshold):
+    similarity = ratio(y_s, p_s)
     return 1 if similarity >= threshold else 0
 
 
-def safe_get(d, path):
-    """Access nested dict safely using dot notation"""
-    keys = path.split(".")
-    for k in keys:
-        if d is None or k not in d:
-            return None
-        d = d[k]
+FIELDS_TO_CHECK = [
+    "seller_name",
+    "fields.field_6",
+    "fields.field_10.subfield_a",
+    "fields.field_10.subfield_b",
+    "fields.field_15",
+    "fields.field_15a.subfield_a",
+    "fields.field_15a.subfield_b",
+    "fields.field_17",
+    "fields.field_17a.subfield_a",
+    "fields.field_17a.subfield_b",
+    "fields.field_18.subfield_left",
+    "fields.field_18.subfield_right",
+    "fields.field_19",
+    "fields.field_21.subfield_left",
+    "fields.field_21.subfield_right",
+    "fields.field_31.subfield_1_left",
+    "fields.field_31.subfield_1_right",
+    "fields.field_31.subfield_2",
+]
+
+_FIELD_PATHS = [(field, tuple(field.split("."))) for field in FIELDS_TO_CHECK]
+
+
+def safe_get(d, keys):
+    """Access nested dict safely using a pre-split key path"""
+    try:
+        for k in keys:
+            d = d[k]
+    except (KeyError, TypeError):
+        return None
     return d
 
 
 def evaluate(gt, pred):
-    fields_to_check = [
-        "seller_name",
-        "fields.field_6",
-        "fields.field_10.subfield_a",
-        "fields.field_10.subfield_b",
-        "fields.field_15",
-        "fields.field_15a.subfield_a",
-        "fields.field_15a.subfield_b",
-        "fields.field_17",
-        "fields.field_17a.subfield_a",
-        "fields.field_17a.subfield_b",
-        "fields.field_18.subfield_left",
-        "fields.field_18.subfield_right",
-        "fields.field_19",
-        "fields.field_21.subfield_left",
-        "fields.field_21.subfield_right",
-        "fields.field_31.subfield_1_left",
-        "fields.field_31.subfield_1_right",
-        "fields.field_31.subfield_2",
-    ]
-
     results = {}
     correct = 0
 
-    for field in fields_to_check:
-        gt_val = safe_get(gt, field)
-        pred_val = safe_get(pred, field)
+    for field, keys in _FIELD_PATHS:
+        gt_val = safe_get(gt, keys)
+        pred_val = safe_get(pred, keys)
 
         match = compare_strings(gt_val, pred_val)
         results[field] = match
         correct += match
 
-    accuracy = (correct / len(fields_to_check)) * 100
+    accuracy = (correct / len(FIELDS_TO_CHECK)) * 100
 
     return results, accuracy
 
 
+def _evaluate_pair(pair):
+    gt_path, pred_path = pair
+    return evaluate(process_file(gt_path), process_file(pred_path))
+
+
+def run_many(pairs):
+    if len(pairs) < _MIN_POOL_PAIRS:
+        return [_evaluate_pair(pair) for pair in pairs]
+    with ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn")) as pool:
+        return list(pool.map(_evaluate_pair, pairs))
+
+
 def main():
     parser = argparse.ArgumentParser(description="Parser benchmark")
     parser.add_argument("--gt", required=True)
@@ -102,15 +140,11 @@ def main():
     else:
         os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
 
-with open(args.out, "w", encoding="utf-8") as f:
-    json.dump(report, f, indent=2, ensure_ascii=False)
-
-print(f"Report saved to: {args.out}")
-
-
     with open(args.out, "w", encoding="utf-8") as f:
         json.dump(report, f, indent=2, ensure_ascii=False)
 
+    print(f"Report saved to: {args.out}")
+
 
 if __name__ == "__main__":
     main()
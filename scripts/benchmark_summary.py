@@ -1,87 +1,115 @@
 #!/usr/bin/env python3
 import argparse
 import json
+import multiprocessing
 import re
 import sys
 import time
-from difflib import SequenceMatcher
-from typing import Any, Dict, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from typing import Any, Dict, List, Tuple, Union
 import os
 from datetime import datetime
 
+from _jsonio import loads
+from _similarity import ratio, ratio_upper_bound
+
 _DIGITS_RE = re.compile(r"\D+")
+_STRIP_NON_DIGITS = _DIGITS_RE.sub
+_ASCII_NON_DIGITS = str.maketrans("", "", "".join(chr(c) for c in range(128) if not chr(c).isdigit()))
 
+_MIN_POOL_PAIRS = 4
 
 def process_file(file_path: str) -> Dict[str, Any]:
-    with open(file_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    with open(file_path, "rb") as f:
+        data = loads(f.read())
     if not isinstance(data, dict):
         raise ValueError(f"{file_path}: expected JSON object at top-level")
     return data
 
 
-def compare_strings(y: Any, pred: Any, threshold: float = 0.85) -> int:
+def _prepare_strings(y: Any, pred: Any, threshold: float) -> Union[int, Tuple[str, str]]:
+    """
+    1 or 0 when the pair is settled without the matcher, else the stripped (y_s, p_s) to score
+    """
     if y == pred:
         return 1
     if y is None or pred is None:
         return 0
-    sim = SequenceMatcher(None, str(y).strip(), str(pred).strip()).ratio()
+    y_s = str(y).strip()
+    p_s = str(pred).strip()
+    if ratio_upper_bound(y_s, p_s) < threshold:
+        return 0
+    return y_s, p_s
+
+
+def compare_strings(y: Any, pred: Any, threshold: float = 0.85) -> int:
+    prepared = _prepare_strings(y, pred, threshold)
+    if isinstance(prepared, int):
+        return prepared
+    return _compare_text(*prepared, threshold)
+
+
+@lru_cache(maxsize=8192)
+def _compare_text(y_s: str, p_s: str, threshold: float) -> int:
+    sim = ratio(y_s, p_s)
     return 1 if sim >= threshold else 0
 
 
 def normalize_hs(code: Any) -> str:
     if code is None:
         return ""
-    return _DIGITS_RE.sub("", str(code).strip())
+    s = str(code)
+    if s.isascii():
+        return s.translate(_ASCII_NON_DIGITS)
+    return _STRIP_NON_DIGITS("", s)
 
 
 def is_valid_hs10(code_digits: str) -> bool:
     return len(code_digits) == 10 and code_digits.isdigit()
 
 
-def extract_pairs(obj: Dict[str, Any]) -> List[Tuple[str, str]]:
-
-    pairs: List[Tuple[str, str]] = []
+def extract_pairs(obj: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    """
+    Parallel lists of normalized HS codes and summary texts, one entry per {hs_code: text} pair
+    """
+    hs_list: List[str] = []
+    txt_list: List[str] = []
     items = obj.get("items", []) or []
     for it in items:
-        if isinstance(it, dict) and len(it) == 1:
+        try:
             (k, v), = it.items()
-            hs = normalize_hs(k)
-            txt = "" if v is None else str(v)
-            pairs.append((hs, txt))
-        elif isinstance(it, dict):
-            for k, v in it.items():
-                hs = normalize_hs(k)
-                txt = "" if v is None else str(v)
-                pairs.append((hs, txt))
-        else:
-            pairs.append(("", ""))
-    return pairs
+        except (ValueError, AttributeError):
+            # multi-key or empty dict: one pair per key; anything else: a blank pair
+            if isinstance(it, dict):
+                for k, v in it.items():
+                    hs_list.append(normalize_hs(k))
+                    txt_list.append("" if v is None else str(v))
+            else:
+                hs_list.append("")
+                txt_list.append("")
+            continue
+        hs_list.append(normalize_hs(k))
+        txt_list.append("" if v is None else str(v))
+    return hs_list, txt_list
 
 
 def evaluate(gt: Dict[str, Any], pred: Dict[str, Any], *, min_sim: float) -> Dict[str, Any]:
     seller_match = compare_strings(gt.get("seller_name"), pred.get("seller_name"), threshold=min_sim)
 
-    gt_pairs = extract_pairs(gt)
-    pr_pairs = extract_pairs(pred)
+    gt_hs, gt_txt = extract_pairs(gt)
+    pr_hs, pr_txt = extract_pairs(pred)
 
-    n_gt = len(gt_pairs)
-    n_pr = len(pr_pairs)
+    n_gt = len(gt_hs)
+    n_pr = len(pr_hs)
     n = max(n_gt, 1)
 
-    items_to_compare = min(n_gt, n_pr)
-
-    pr_valid_hs10 = sum(1 for hs, _ in pr_pairs if is_valid_hs10(hs))
-
-    hs_exact = 0
-    summary_match = 0
-
-    for i in range(items_to_compare):
-        g_hs, g_txt = gt_pairs[i]
-        p_hs, p_txt = pr_pairs[i]
+    pr_valid_hs10 = sum(1 for hs in pr_hs if is_valid_hs10(hs))
 
-        hs_exact += 1 if g_hs and p_hs and g_hs == p_hs else 0
-        summary_match += compare_strings(g_txt, p_txt, threshold=min_sim)
+    hs_exact = sum(1 for g_hs, p_hs in zip(gt_hs, pr_hs) if g_hs and g_hs == p_hs)
+    summary_match = sum(
+        compare_strings(g_txt, p_txt, threshold=min_sim) for g_txt, p_txt in zip(gt_txt, pr_txt)
+    )
 
     item_count_match = 1 if n_gt == n_pr else 0
 
@@ -97,6 +125,19 @@ def evaluate(gt: Dict[str, Any], pred: Dict[str, Any], *, min_sim: float) -> Dic
     }
 
 
+def _evaluate_pair(pair: Tuple[str, str], min_sim: float) -> Dict[str, Any]:
+    gt_path, pred_path = pair
+    return evaluate(process_file(gt_path), process_file(pred_path), min_sim=min_sim)
+
+
+def run_many(pairs: List[Tuple[str, str]], *, min_sim: float = 0.85) -> List[Dict[str, Any]]:
+    worker = partial(_evaluate_pair, min_sim=min_sim)
+    if len(pairs) < _MIN_POOL_PAIRS:
+        return [worker(pair) for pair in pairs]
+    with ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn")) as pool:
+        return list(pool.map(worker, pairs))
+
+
 def main():
     ap = argparse.ArgumentParser(description="Benchmark summary JSON")
     ap.add_argument("--gt", required=True)